@@ -1,12 +1,22 @@
 import eventlet
+import eventlet.wsgi
 eventlet.monkey_patch()
 
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask import Flask, render_template, request, abort, jsonify, Response
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 import logging
 import time
 import random
 import json
+import math
+import os
+import sys
+import functools
+import struct
+import socket
+import argparse
+from collections import deque
+from eventlet.queue import LightQueue, Full
 from datetime import datetime
 
 # Initialize Flask
@@ -41,6 +51,12 @@ DEFAULT_CONFIG = {
 
 GAME_CONFIG = DEFAULT_CONFIG.copy()
 
+# Input limits - keep every value representable in the packed wire format (u32 / u8-length strings)
+MAX_CONFIG_VALUE = 0xFFFFFFFF
+MAX_NAME_LENGTH = 24
+MIN_COST_MULTIPLIER = 0.1
+MAX_COST_MULTIPLIER = 10.0
+
 ABILITY_COSTS_BASE = {
     'instant_charge': 150,
     'shield_break': 200,
@@ -91,6 +107,109 @@ GAME_STATE = {
     }
 }
 
+# --- DIAGNOSTICS (Sampling Profiler + Event Trace) ---
+# The sampler runs on a real OS thread (not a greenlet) so it keeps ticking
+# even when a greenlet hogs the hub - which is exactly the stutter we hunt.
+
+_real_threading = eventlet.patcher.original('threading')
+_real_time = eventlet.patcher.original('time')
+HUB_THREAD_ID = _real_threading.get_ident()
+
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_MAX_STACK_DEPTH = 64
+TRACE_BUFFER_SIZE = 2000
+LOCAL_ADDRESSES = ("127.0.0.1", "::1", "localhost")
+
+PROFILER = {
+    "running": False,
+    "trace_enabled": False,
+    "started_at": 0,
+    "stopped_at": 0,
+    "sample_count": 0,
+    "samples": {},
+    "thread": None
+}
+PROFILER_LOCK = _real_threading.Lock()
+TRACE_EVENTS = deque(maxlen=TRACE_BUFFER_SIZE)
+
+def _collapse_frame(frame):
+    stack = []
+    while frame is not None and len(stack) < PROFILER_MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+def _sampler_loop():
+    while PROFILER["running"]:
+        frame = sys._current_frames().get(HUB_THREAD_ID)
+        if frame is not None:
+            stack = _collapse_frame(frame)
+            with PROFILER_LOCK:
+                PROFILER["samples"][stack] = PROFILER["samples"].get(stack, 0) + 1
+                PROFILER["sample_count"] += 1
+        _real_time.sleep(PROFILER_SAMPLE_INTERVAL)
+
+def start_profiler(trace_enabled=False):
+    if PROFILER["running"]: return False
+    with PROFILER_LOCK:
+        PROFILER["samples"] = {}
+        PROFILER["sample_count"] = 0
+    TRACE_EVENTS.clear()
+    PROFILER["trace_enabled"] = trace_enabled
+    PROFILER["started_at"] = time.time()
+    PROFILER["stopped_at"] = 0
+    PROFILER["running"] = True
+    PROFILER["thread"] = _real_threading.Thread(target=_sampler_loop, name="profiler", daemon=True)
+    PROFILER["thread"].start()
+    print(f"--- PROFILER STARTED (trace: {trace_enabled}) ---")
+    return True
+
+def stop_profiler():
+    if not PROFILER["running"]: return False
+    PROFILER["running"] = False
+    PROFILER["trace_enabled"] = False
+    PROFILER["stopped_at"] = time.time()
+    PROFILER["thread"].join()
+    PROFILER["thread"] = None
+    print(f"--- PROFILER STOPPED ({PROFILER['sample_count']} samples) ---")
+    return True
+
+def collapsed_stacks():
+    """Brendan Gregg's folded format - feed straight into flamegraph.pl / speedscope."""
+    with PROFILER_LOCK:
+        samples = sorted(PROFILER["samples"].items(), key=lambda item: item[1], reverse=True)
+    return "\n".join(f"{stack} {count}" for stack, count in samples)
+
+def profiler_status():
+    end = PROFILER["stopped_at"] or time.time()
+    return {
+        "running": PROFILER["running"],
+        "trace_enabled": PROFILER["trace_enabled"],
+        "sample_count": PROFILER["sample_count"],
+        "duration": round(end - PROFILER["started_at"], 2) if PROFILER["started_at"] else 0,
+        "trace_size": len(TRACE_EVENTS)
+    }
+
+def record_trace(event, started, **extra):
+    if not PROFILER["trace_enabled"]: return
+    entry = {"ts": started, "event": event, "ms": round((time.time() - started) * 1000, 3)}
+    entry.update(extra)
+    TRACE_EVENTS.append(entry)
+
+def traced(handler):
+    """Wraps a socket handler so each call lands in the trace ring buffer (when enabled)."""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not PROFILER["trace_enabled"]:
+            return handler(*args, **kwargs)
+        started = time.time()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            record_trace(handler.__name__, started, sid=request.sid)
+    return wrapper
+
 # --- HELPERS ---
 
 def get_difficulty_multiplier():
@@ -102,8 +221,7 @@ def get_difficulty_multiplier():
     reduction = minutes_over_start * DIFFICULTY_REDUCTION_RATE
     return max(MIN_DIFFICULTY_MULTIPLIER, 1.0 - reduction)
 
-def broadcast_game_state():
-    current_time = time.time()
+def build_game_state(current_time):
     base_difficulty = get_difficulty_multiplier() if GAME_STATE["active"] else 1.0
     
     nodes_data = {}
@@ -146,8 +264,349 @@ def broadcast_game_state():
         "modifiers": GAME_STATE["modifiers"],
         "config": GAME_CONFIG
     }
-    
-    socketio.emit('update_state', state, room='web_clients')
+    return state
+
+def broadcast_game_state():
+    current_time = time.time()
+    state = build_game_state(current_time)
+
+    # Legacy clients get JSON; clients that negotiated the packed format get one binary frame.
+    socketio.emit('update_state', state, room='json_clients')
+    if PACKED_SIDS:
+        socketio.emit('update_state_packed', encode_packed_state(state, current_time), room='packed_clients')
+
+    replicate_state()
+
+# --- WIRE ENCODING (Packed update_state) ---
+# Schema-driven little-endian layout: keys are implied by position, teams/speeds/
+# abilities are enum codes, and epoch timestamps travel as f32 offsets from one
+# f64 server clock. Must stay in sync with static/js/modules/WireCodec.js.
+
+WIRE_FORMAT_VERSION = 1
+PACKED_SIDS = set()
+
+WIRE_TEAMS = ["NEUTRAL", "RED", "BLUE", "SPECTATOR"]
+WIRE_SPEEDS = [None, "FAST", "NORMAL", "SLOW"]
+WIRE_ABILITIES = list(ABILITY_COSTS_BASE.keys())
+WIRE_NULL_STRING = 0xFF
+
+# version, flags, server_time, game_duration, difficulty, scores R/B, bonus R/B, boost/frozen R/B
+WIRE_HEADER = struct.Struct('<BBdff4f4f')
+# max_score, max_ap, cost_mult, shield fast/normal, bonus fast/normal, excluded count
+WIRE_CONFIG = struct.Struct('<IIf4IB')
+# owner, capture_speed, shield_end offset
+WIRE_NODE = struct.Struct('<BBf')
+# team, flags, ability_points
+WIRE_PLAYER = struct.Struct('<BBI')
+
+def _wire_uint(value):
+    return max(0, min(MAX_CONFIG_VALUE, int(value)))
+
+def _wire_offset(timestamp, now):
+    return 0.0 if not timestamp else timestamp - now
+
+def _wire_string(parts, value):
+    if value is None:
+        parts.append(bytes([WIRE_NULL_STRING]))
+        return
+    raw = str(value).encode('utf-8')[:WIRE_NULL_STRING - 1]
+    raw = raw.decode('utf-8', 'ignore').encode('utf-8')
+    parts.append(bytes([len(raw)]))
+    parts.append(raw)
+
+def encode_packed_state(state, now):
+    config = state["config"]
+    modifiers = state["modifiers"]
+    flags = (1 if state["game_active"] else 0) | (2 if config["battery_drain_enabled"] else 0)
+
+    parts = [WIRE_HEADER.pack(
+        WIRE_FORMAT_VERSION, flags, now,
+        state["game_duration"], state["difficulty_multiplier"],
+        state["scores"]["RED"], state["scores"]["BLUE"],
+        state["bonus_scores"]["RED"], state["bonus_scores"]["BLUE"],
+        _wire_offset(modifiers["RED"]["score_boost_end"], now), _wire_offset(modifiers["RED"]["frozen_end"], now),
+        _wire_offset(modifiers["BLUE"]["score_boost_end"], now), _wire_offset(modifiers["BLUE"]["frozen_end"], now)
+    )]
+
+    excluded = [WIRE_ABILITIES.index(a) for a in config.get("excluded_abilities", []) if a in WIRE_ABILITIES]
+    parts.append(WIRE_CONFIG.pack(
+        _wire_uint(config["max_score"]), _wire_uint(config["max_ap"]), config["ability_cost_multiplier"],
+        _wire_uint(config["shield_duration_fast"]), _wire_uint(config["shield_duration_normal"]),
+        _wire_uint(config["hack_bonus_fast"]), _wire_uint(config["hack_bonus_normal"]),
+        len(excluded)
+    ))
+    parts.append(bytes(excluded))
+
+    _wire_string(parts, state["game_master"])
+    _wire_string(parts, state["red_team_name"])
+    _wire_string(parts, state["blue_team_name"])
+
+    parts.append(bytes([len(state["nodes"])]))
+    for node_id, node in state["nodes"].items():
+        _wire_string(parts, node_id)
+        parts.append(WIRE_NODE.pack(
+            WIRE_TEAMS.index(node["owner"]),
+            WIRE_SPEEDS.index(node["capture_speed"]),
+            _wire_offset(node["shield_end"], now)
+        ))
+
+    parts.append(struct.pack('<H', len(state["players"])))
+    for code, p in state["players"].items():
+        _wire_string(parts, code)
+        _wire_string(parts, p["name"])
+        player_flags = (1 if p["charged"] else 0) | (2 if p["is_gm"] else 0) | (4 if p["is_team_lead"] else 0)
+        parts.append(WIRE_PLAYER.pack(WIRE_TEAMS.index(p["team"]), player_flags, _wire_uint(p["ability_points"])))
+
+    return b"".join(parts)
+
+# --- REPLICATION (Warm Standby) ---
+# The primary streams newline-delimited JSON over TCP to any connected standby:
+# a full snapshot on connect, then per-section deltas whenever state is broadcast
+# (every mutating handler + the 1s scoring tick), plus heartbeats. The standby
+# applies them to its own globals and promotes itself when heartbeats stop.
+#
+# Split-brain guards: servers bind without SO_REUSEPORT, so a standby cannot
+# promote while a stalled primary on the same box still holds the ports; and a
+# promoted standby bumps the epoch and tells the old primary it was superseded,
+# which makes that process exit as soon as it runs again.
+
+REPLICATION_HEARTBEAT_INTERVAL = 0.5
+REPLICATION_MISSED_HEARTBEATS = 5
+REPLICATION_FAILOVER_TIMEOUT = REPLICATION_HEARTBEAT_INTERVAL * REPLICATION_MISSED_HEARTBEATS
+REPLICATION_RECONNECT_DELAY = 0.25
+REPLICATION_FENCE_RETRY = 1.0
+REPLICATION_SEND_TIMEOUT = 2.0
+REPLICATION_QUEUE_SIZE = 256
+
+REPLICAS = []
+REPLICATION_STATE = {"epoch": 0, "synced": False, "last_sections": {}, "ranking_sent": 0}
+
+def replicated_sections():
+    # Socket IDs are per-process; replicated players come back 'offline' and
+    # re-attach through the normal reconnection path in player_login.
+    # RANKING is left out: it only ever grows, so it ships whole in the snapshot
+    # and as appended entries afterwards instead of being re-diffed every broadcast.
+    players = {code: {**p, "socket_id": None} for code, p in PLAYERS.items()}
+    return {
+        "nodes": NODES,
+        "scores": SCORES,
+        "bonus_scores": BONUS_SCORES,
+        "players": players,
+        "game_state": GAME_STATE,
+        "config": GAME_CONFIG
+    }
+
+def apply_replicated_sections(sections):
+    global NODES, SCORES, BONUS_SCORES, PLAYERS, RANKING, GAME_STATE, GAME_CONFIG
+    if "nodes" in sections: NODES = sections["nodes"]
+    if "scores" in sections: SCORES = sections["scores"]
+    if "bonus_scores" in sections: BONUS_SCORES = sections["bonus_scores"]
+    if "players" in sections: PLAYERS = sections["players"]
+    if "ranking" in sections: RANKING = sections["ranking"]
+    if "ranking_append" in sections: RANKING.extend(sections["ranking_append"])
+    if "game_state" in sections: GAME_STATE = sections["game_state"]
+    if "config" in sections: GAME_CONFIG = sections["config"]
+
+def encode_replicated_sections():
+    return {name: json.dumps(section) for name, section in replicated_sections().items()}
+
+def _replication_line(message_type, encoded_sections=None, **fields):
+    # Sections are spliced in pre-serialised, so the bytes a standby receives are
+    # exactly the strings recorded as the delta baseline.
+    message = json.dumps({"type": message_type, "epoch": REPLICATION_STATE["epoch"], **fields})
+    if encoded_sections is not None:
+        body = ", ".join(f"{json.dumps(name)}: {data}" for name, data in encoded_sections.items())
+        message = message[:-1] + f', "sections": {{{body}}}}}'
+    return (message + "\n").encode('utf-8')
+
+def _drop_replica(replica):
+    if replica not in REPLICAS: return
+    REPLICAS.remove(replica)
+    replica["conn"].close()
+    try:
+        replica["queue"].put_nowait(None)  # wake the writer so it exits
+    except Full:
+        pass
+    print(f"--- STANDBY {replica['addr']} DISCONNECTED ---")
+
+def _replica_writer(replica):
+    # One writer per socket: handlers never block on a slow standby, and lines never interleave.
+    while True:
+        line = replica["queue"].get()
+        if line is None: return
+        try:
+            replica["conn"].sendall(line)
+        except OSError:
+            _drop_replica(replica)
+            return
+
+def _replica_reader(replica):
+    # Standbys only ever send one thing upstream: a 'superseded' notice after promoting.
+    buffer = b""
+    while replica in REPLICAS:
+        try:
+            chunk = replica["conn"].recv(4096)
+        except socket.timeout:
+            continue
+        except OSError:
+            break
+        if not chunk: break
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("type") == "superseded" and message.get("epoch", 0) > REPLICATION_STATE["epoch"]:
+                fence_superseded(message["epoch"])
+    _drop_replica(replica)
+
+def fence_superseded(epoch):
+    # A standby has already taken over; serving on would split the match in two.
+    print(f"--- SUPERSEDED BY PROMOTED STANDBY (epoch {epoch}). SHUTTING DOWN ---")
+    os._exit(1)
+
+def notify_superseded(primary_host, primary_port, epoch):
+    """Keeps telling the old primary it was replaced until it hears it or is gone."""
+    line = (json.dumps({"type": "superseded", "epoch": epoch}) + "\n").encode('utf-8')
+    while True:
+        try:
+            conn = socket.create_connection((primary_host, primary_port), timeout=REPLICATION_SEND_TIMEOUT)
+        except ConnectionRefusedError:
+            return  # nothing listening - the old primary process is gone
+        except OSError:
+            socketio.sleep(REPLICATION_FENCE_RETRY)
+            continue
+        try:
+            conn.sendall(line)
+            print(f"--- SUPERSEDED NOTICE SENT TO {primary_host}:{primary_port} ---")
+            return
+        except OSError:
+            socketio.sleep(REPLICATION_FENCE_RETRY)
+        finally:
+            conn.close()
+
+def is_local_host(host):
+    try:
+        address = socket.gethostbyname(host)
+        return address.startswith("127.") or address in socket.gethostbyname_ex(socket.gethostname())[2]
+    except OSError:
+        return False
+
+def bind_exclusive(port):
+    # No SO_REUSEPORT: the bind must fail while another process still holds the port.
+    return eventlet.listen(('0.0.0.0', port), reuse_port=False)
+
+def claim_ports(port, replication_port):
+    """Binds the client (and replication) listeners, or raises OSError if either is taken."""
+    client_listener = bind_exclusive(port)
+    if not replication_port: return client_listener, None
+    try:
+        return client_listener, bind_exclusive(replication_port)
+    except OSError:
+        client_listener.close()
+        raise
+
+def _replication_broadcast(line):
+    for replica in list(REPLICAS):
+        try:
+            replica["queue"].put_nowait(line)
+        except Full:
+            print(f"--- STANDBY {replica['addr']} NOT KEEPING UP ---")
+            _drop_replica(replica)
+
+def replicate_state():
+    if not REPLICAS: return
+
+    encoded = encode_replicated_sections()
+    last = REPLICATION_STATE["last_sections"]
+    changed = {name: data for name, data in encoded.items() if last.get(name) != data}
+    REPLICATION_STATE["last_sections"] = encoded
+
+    new_entries = RANKING[REPLICATION_STATE["ranking_sent"]:]
+    if new_entries:
+        changed["ranking_append"] = json.dumps(new_entries)
+        REPLICATION_STATE["ranking_sent"] = len(RANKING)
+
+    if changed:
+        _replication_broadcast(_replication_line("delta", changed))
+
+def replication_heartbeat():
+    while True:
+        socketio.sleep(REPLICATION_HEARTBEAT_INTERVAL)
+        if REPLICAS:
+            _replication_broadcast(_replication_line("heartbeat", ts=time.time()))
+
+def replication_server(listener):
+    print(f"--- REPLICATION LISTENING ON :{listener.getsockname()[1]} (epoch {REPLICATION_STATE['epoch']}) ---")
+    socketio.start_background_task(replication_heartbeat)
+    while True:
+        conn, addr = listener.accept()
+        conn.settimeout(REPLICATION_SEND_TIMEOUT)
+
+        # Flush pending deltas to attached standbys, then snapshot and re-baseline
+        # from the same strings - nothing here yields, so no mutation can slip between.
+        replicate_state()
+        encoded = encode_replicated_sections()
+        REPLICATION_STATE["last_sections"] = encoded
+        REPLICATION_STATE["ranking_sent"] = len(RANKING)
+
+        replica = {"conn": conn, "addr": addr[0], "queue": LightQueue(REPLICATION_QUEUE_SIZE)}
+        replica["queue"].put_nowait(_replication_line("snapshot", {**encoded, "ranking": json.dumps(RANKING)}))
+        REPLICAS.append(replica)
+        socketio.start_background_task(_replica_writer, replica)
+        socketio.start_background_task(_replica_reader, replica)
+        print(f"--- STANDBY ATTACHED FROM {addr[0]} ---")
+
+def run_standby(primary_host, primary_port, failover_timeout):
+    """
+    Blocks while following the primary. Returns once the primary has been
+    silent for failover_timeout after at least one full sync; the caller
+    then tries to claim the ports and promote this process.
+    """
+    last_heard = time.time()
+    print(f"--- STANDBY FOLLOWING {primary_host}:{primary_port} ---")
+
+    def primary_lost():
+        return REPLICATION_STATE["synced"] and time.time() - last_heard > failover_timeout
+
+    while not primary_lost():
+        try:
+            conn = socket.create_connection((primary_host, primary_port), timeout=failover_timeout)
+        except OSError:
+            time.sleep(REPLICATION_RECONNECT_DELAY)
+            continue
+
+        conn.settimeout(REPLICATION_HEARTBEAT_INTERVAL)
+        buffer = b""
+        try:
+            while not primary_lost():
+                try:
+                    chunk = conn.recv(65536)
+                except socket.timeout:
+                    continue
+                if not chunk: break
+                buffer += chunk
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    message = json.loads(line)
+                    last_heard = time.time()
+                    REPLICATION_STATE["epoch"] = max(REPLICATION_STATE["epoch"], message.get("epoch", 0))
+                    if message["type"] in ("snapshot", "delta"):
+                        apply_replicated_sections(message["sections"])
+                        if message["type"] == "snapshot":
+                            REPLICATION_STATE["synced"] = True
+                            print("--- STANDBY SYNCED ---")
+        except OSError:
+            pass
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Malformed frame: drop the connection; reconnecting brings a fresh snapshot.
+            print(f"--- BAD REPLICATION FRAME ({e!r}). RESYNCING ---")
+        finally:
+            conn.close()
+
+    print(f"--- PRIMARY SILENT FOR {failover_timeout}s. ATTEMPTING PROMOTION ---")
 
 def save_current_ranking(winner_team, reason):
     if GAME_STATE["results_saved"]:
@@ -195,6 +654,7 @@ def continuous_scoring():
             continue
             
         current_time = time.time()
+        tick_started = current_time
         base_difficulty = get_difficulty_multiplier()
         
         total_red = SCORES["RED"] + BONUS_SCORES["RED"]
@@ -244,6 +704,7 @@ def continuous_scoring():
             }, room='web_clients')
         
         broadcast_game_state()
+        record_trace('scoring_tick', tick_started)
 
 # --- ROUTES ---
 
@@ -251,9 +712,36 @@ def continuous_scoring():
 def index(): 
     return render_template('index.html')
 
+# Debug routes only answer on the server laptop itself (curl from localhost).
+def require_local_request():
+    if request.remote_addr not in LOCAL_ADDRESSES: abort(403)
+
+@app.route('/debug/profile/start', methods=['POST'])
+def debug_profile_start():
+    require_local_request()
+    start_profiler(trace_enabled=request.args.get('trace') == '1')
+    return jsonify(profiler_status())
+
+@app.route('/debug/profile/stop', methods=['POST'])
+def debug_profile_stop():
+    require_local_request()
+    stop_profiler()
+    return jsonify(profiler_status())
+
+@app.route('/debug/profile')
+def debug_profile():
+    require_local_request()
+    return Response(collapsed_stacks(), mimetype='text/plain')
+
+@app.route('/debug/trace')
+def debug_trace():
+    require_local_request()
+    return jsonify({"status": profiler_status(), "events": list(TRACE_EVENTS)})
+
 # --- SOCKET EVENTS ---
 
 @socketio.on('disconnect')
+@traced
 def handle_disconnect():
     """
     Handle client disconnection.
@@ -261,6 +749,7 @@ def handle_disconnect():
     """
     sid = request.sid
     disconnected_player_code = None
+    PACKED_SIDS.discard(sid)
 
     for code, p in PLAYERS.items():
         if p.get('socket_id') == sid:
@@ -272,12 +761,33 @@ def handle_disconnect():
     if disconnected_player_code:
         broadcast_game_state()
 
+@socketio.on('set_wire_format')
+@traced
+def handle_set_wire_format(data):
+    """
+    Opt-in to the packed update_state encoding.
+    Clients that never send this (older cached JS) keep receiving JSON.
+    """
+    if data.get('format') == 'packed' and data.get('version') == WIRE_FORMAT_VERSION:
+        PACKED_SIDS.add(request.sid)
+        if 'web_clients' in rooms():
+            leave_room('json_clients')
+            join_room('packed_clients')
+        emit('wire_format', {'format': 'packed', 'version': WIRE_FORMAT_VERSION})
+    else:
+        PACKED_SIDS.discard(request.sid)
+        leave_room('packed_clients')
+        if 'web_clients' in rooms(): join_room('json_clients')
+        emit('wire_format', {'format': 'json', 'version': WIRE_FORMAT_VERSION})
+
 @socketio.on('player_login')
+@traced
 def handle_login(data):
     join_room('web_clients')
+    join_room('packed_clients' if request.sid in PACKED_SIDS else 'json_clients')
     code = data.get('shortCode', '').upper()
     
-    if not code: return 
+    if not code or len(code) > MAX_NAME_LENGTH: return 
 
     # 1. Check for Duplicate Active Login
     if code in PLAYERS:
@@ -368,6 +878,7 @@ def handle_login(data):
     broadcast_game_state()
     
 @socketio.on('release_identity')
+@traced
 def handle_release_identity(data):
     """
     Explicit logout: Wipes the player from memory.
@@ -390,19 +901,21 @@ def handle_release_identity(data):
         broadcast_game_state()
 
 @socketio.on('set_player_name')
+@traced
 def handle_set_player_name(data):
     code = data.get('shortCode', '').upper()
-    name = data.get('name', '').strip()
+    name = data.get('name', '').strip()[:MAX_NAME_LENGTH]
     if code in PLAYERS and name:
         PLAYERS[code]['name'] = name
         emit('name_updated', {'name': name})
         broadcast_game_state()
 
 @socketio.on('set_team_name')
+@traced
 def handle_set_team_name(data):
     code = data.get('shortCode', '').upper()
     team_to_rename = data.get('team')
-    name = data.get('name', '').strip()
+    name = data.get('name', '').strip()[:MAX_NAME_LENGTH]
     player = PLAYERS.get(code)
     if not player: return
     
@@ -420,6 +933,7 @@ def handle_set_team_name(data):
     }, broadcast=True)
 
 @socketio.on('update_game_config')
+@traced
 def handle_update_game_config(data):
     code = data.get('shortCode', '').upper()
     new_config = data.get('config', {})
@@ -435,16 +949,21 @@ def handle_update_game_config(data):
             if key == "battery_drain_enabled":
                 GAME_CONFIG[key] = bool(new_config[key])
             elif key == "ability_cost_multiplier":
-                GAME_CONFIG[key] = float(new_config[key])
+                multiplier = float(new_config[key])
+                if math.isfinite(multiplier):
+                    GAME_CONFIG[key] = max(MIN_COST_MULTIPLIER, min(MAX_COST_MULTIPLIER, multiplier))
             elif key == "excluded_abilities":
-                GAME_CONFIG[key] = list(new_config[key]) 
+                # Known abilities only, no duplicates
+                requested = new_config[key] if isinstance(new_config[key], list) else []
+                GAME_CONFIG[key] = [a for a in ABILITY_COSTS_BASE if a in requested]
             else:
-                GAME_CONFIG[key] = int(new_config[key])
+                GAME_CONFIG[key] = max(0, min(MAX_CONFIG_VALUE, int(new_config[key])))
     
     emit('config_updated', {'msg': 'Game Configuration Saved.'}, room=player['socket_id'])
     broadcast_game_state()
 
 @socketio.on('start_game_now')
+@traced
 def handle_start_game_now(data):
     code = data.get('shortCode', '').upper()
     player = PLAYERS.get(code)
@@ -457,10 +976,12 @@ def handle_start_game_now(data):
         broadcast_game_state()
 
 @socketio.on('get_leaderboard')
+@traced
 def handle_get_leaderboard(data): 
     emit('leaderboard_data', {'ranking': RANKING})
 
 @socketio.on('restart_game')
+@traced
 def handle_restart_game(data):
     global NODES, SCORES, BONUS_SCORES, GAME_STATE
     code = data.get('shortCode', '').upper()
@@ -492,6 +1013,7 @@ def handle_restart_game(data):
     broadcast_game_state()
 
 @socketio.on('end_session')
+@traced
 def handle_end_session(data):
     global NODES, SCORES, BONUS_SCORES, GAME_STATE, PLAYERS
     code = data.get('shortCode', '').upper()
@@ -518,10 +1040,12 @@ def handle_end_session(data):
     emit('force_logout', {'message': 'Session Ended.'}, room='web_clients')
 
 @socketio.on('game_finish')
+@traced
 def handle_game_finish(data):
     handle_end_session(data)
 
 @socketio.on('register_node')
+@traced
 def handle_node_registration(data):
     if isinstance(data, str):
         try: data = json.loads(data)
@@ -532,6 +1056,7 @@ def handle_node_registration(data):
         if node_id in NODES: emit('update_screen', NODES[node_id]['owner'], room=request.sid)
 
 @socketio.on('rfid_scan')
+@traced
 def handle_rfid_scan(data):
     uid = data.get('uid')
     node_id = data.get('node_id')
@@ -569,6 +1094,7 @@ def handle_rfid_scan(data):
         socketio.emit('error_msg', {'msg': 'BATTERY EMPTY!'}, room=player['socket_id'])
 
 @socketio.on('minigame_result')
+@traced
 def handle_minigame_result(data):
     success = data.get('success')
     node_id = data.get('node')
@@ -641,6 +1167,7 @@ def handle_minigame_result(data):
     broadcast_game_state()
 
 @socketio.on('cast_ability')
+@traced
 def handle_cast_ability(data):
     code = data.get('shortCode')
     ability_type = data.get('type')
@@ -699,6 +1226,65 @@ def handle_cast_ability(data):
     emit('ability_announcement', {'team': team, 'type': ability_type, 'msg': msg}, room='web_clients')
     broadcast_game_state()
 
+@socketio.on('start_profiler')
+@traced
+def handle_start_profiler(data):
+    code = data.get('shortCode', '').upper()
+    player = PLAYERS.get(code)
+    if not player or not player['is_gm']: return
+
+    if not start_profiler(trace_enabled=bool(data.get('trace', False))):
+        emit('error_msg', {'msg': 'PROFILER ALREADY RUNNING!'}, room=player['socket_id'])
+        return
+    emit('profiler_status', profiler_status(), room=player['socket_id'])
+
+@socketio.on('stop_profiler')
+def handle_stop_profiler(data):
+    code = data.get('shortCode', '').upper()
+    player = PLAYERS.get(code)
+    if not player or not player['is_gm']: return
+
+    if not stop_profiler():
+        emit('error_msg', {'msg': 'PROFILER NOT RUNNING!'}, room=player['socket_id'])
+        return
+    emit('profiler_report', {
+        'status': profiler_status(),
+        'collapsed': collapsed_stacks(),
+        'trace': list(TRACE_EVENTS)
+    }, room=player['socket_id'])
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cyber-War game server")
+    parser.add_argument('--port', type=int, default=5000, help="Port for phones and nodes")
+    parser.add_argument('--replication-port', type=int, default=None, help="Stream live state to a standby on this port")
+    parser.add_argument('--standby-of', default=None, metavar='HOST:PORT', help="Run as warm standby of this primary")
+    parser.add_argument('--failover-timeout', type=float, default=REPLICATION_FAILOVER_TIMEOUT,
+                        help="Seconds of primary silence before a standby promotes itself")
+    args = parser.parse_args()
+
+    if args.standby_of:
+        primary_host, primary_port = args.standby_of.rsplit(':', 1)
+        while True:
+            run_standby(primary_host, int(primary_port), args.failover_timeout)
+            try:
+                client_listener, replication_listener = claim_ports(args.port, args.replication_port)
+                break
+            except OSError as e:
+                # Ports still held means the primary process is alive (just stalled) - keep following it.
+                print(f"--- PROMOTION ABORTED, PORTS STILL IN USE ({e}). RESUMING STANDBY ---")
+
+        REPLICATION_STATE["epoch"] += 1
+        print(f"--- STANDBY PROMOTED TO PRIMARY (epoch {REPLICATION_STATE['epoch']}) ---")
+        if replication_listener and int(primary_port) == args.replication_port and is_local_host(primary_host):
+            # We just bound the old primary's replication port ourselves, so it has exited - nothing to fence.
+            print(f"--- OLD PRIMARY {primary_host}:{primary_port} IS GONE (PORT NOW OURS). SUPERSEDED NOTICE SKIPPED ---")
+        else:
+            socketio.start_background_task(notify_superseded, primary_host, int(primary_port), REPLICATION_STATE["epoch"])
+    else:
+        client_listener, replication_listener = claim_ports(args.port, args.replication_port)
+
+    if replication_listener:
+        socketio.start_background_task(replication_server, replication_listener)
     socketio.start_background_task(continuous_scoring)
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+    # Same as socketio.run() under eventlet, but on our own non-reuseport listener.
+    eventlet.wsgi.server(client_listener, app, log_output=False)
@@ -47,8 +47,10 @@ document.addEventListener("DOMContentLoaded", () => {
     
     socketClient.on('connect', () => {
         logger.info("Connected to server");
-        const savedPlayerId = localStorage.getItem('playerCode');
-        if (savedPlayerId && !window.myPlayerId) {
+        // Log in again on every (re)connect: a new socket (e.g. after a server
+        // failover) is not in the 'web_clients' room until it does.
+        const savedPlayerId = window.myPlayerId || localStorage.getItem('playerCode');
+        if (savedPlayerId) {
             socketClient.emit('player_login', { shortCode: savedPlayerId });
         }
     });
@@ -78,6 +78,13 @@ class GMManager {
         if (endGameBtn) endGameBtn.addEventListener('click', () => this.endGame());
         if (startGameBtn) startGameBtn.addEventListener('click', () => this.startGameNow());
 
+        // --- DIAGNOSTICS ---
+        const startProfilerBtn = document.getElementById('btn-start-profiler');
+        const stopProfilerBtn = document.getElementById('btn-stop-profiler');
+
+        if (startProfilerBtn) startProfilerBtn.addEventListener('click', () => this.startProfiler());
+        if (stopProfilerBtn) stopProfilerBtn.addEventListener('click', () => this.stopProfiler());
+
         // --- SYSTEM / LOGOUT ---
         const logoutBtn = document.getElementById('btn-menu-logout');
         if (logoutBtn) {
@@ -215,6 +222,17 @@ class GMManager {
             }
         });
 
+        this.socket.on('profiler_status', (data) => {
+            this.setProfilerButtons(data.running);
+            if(window.notificationManager) window.notificationManager.system('PROFILER ONLINE', `Sampling hub thread (trace: ${data.trace_enabled ? 'ON' : 'OFF'})`);
+        });
+
+        this.socket.on('profiler_report', (data) => {
+            this.setProfilerButtons(false);
+            this.downloadProfilerReport(data);
+            if(window.notificationManager) window.notificationManager.success('PROFILE CAPTURED', `${data.status.sample_count} samples in ${data.status.duration}s`);
+        });
+
         this.socket.on('config_updated', (data) => {
             if(window.notificationManager) window.notificationManager.success("CONFIG SAVED", data.msg);
         });
@@ -297,6 +315,47 @@ class GMManager {
         }
     }
 
+    // --- PROFILER CONTROL ---
+    startProfiler() {
+        if(!this.isGM) return;
+        const traceToggle = document.getElementById('conf-profiler-trace');
+        this.socket.emit('start_profiler', {
+            shortCode: this.currentPlayer,
+            trace: traceToggle ? traceToggle.checked : false
+        });
+    }
+
+    stopProfiler() {
+        if(!this.isGM) return;
+        this.socket.emit('stop_profiler', { shortCode: this.currentPlayer });
+    }
+
+    setProfilerButtons(running) {
+        const startBtn = document.getElementById('btn-start-profiler');
+        const stopBtn = document.getElementById('btn-stop-profiler');
+        if(startBtn) startBtn.style.display = running ? 'none' : 'block';
+        if(stopBtn) stopBtn.style.display = running ? 'block' : 'none';
+    }
+
+    downloadProfilerReport(data) {
+        const stamp = new Date().toISOString().replace(/[:.]/g, '-');
+        const save = (content, filename, type) => {
+            const url = URL.createObjectURL(new Blob([content], { type: type }));
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = filename;
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+            URL.revokeObjectURL(url);
+        };
+
+        save(data.collapsed, `profile-${stamp}.folded`, 'text/plain');
+        if (data.trace && data.trace.length) {
+            save(JSON.stringify(data.trace, null, 2), `trace-${stamp}.json`, 'application/json');
+        }
+    }
+
     performLogout() {
         if(window.notificationManager) {
             window.notificationManager.confirm(
@@ -325,6 +384,7 @@ class GMManager {
         const playerSection = document.getElementById('gm-section-player');
         const leaderboardSection = document.getElementById('gm-section-leaderboard');
         const systemSection = document.getElementById('gm-section-system');
+        const diagnosticsSection = document.getElementById('gm-section-diagnostics');
 
         // VISIBLE TO EVERYONE
         if (playerSection) playerSection.style.display = 'block';
@@ -334,6 +394,7 @@ class GMManager {
         // GM ONLY
         if (configSection) configSection.style.display = this.isGM ? 'block' : 'none';
         if (controlSection) controlSection.style.display = this.isGM ? 'block' : 'none';
+        if (diagnosticsSection) diagnosticsSection.style.display = this.isGM ? 'block' : 'none';
 
         // TEAM NAMES (GM or Team Lead)
         if (teamSection) {
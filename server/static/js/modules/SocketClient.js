@@ -2,15 +2,31 @@ class SocketClient {
     constructor() {
         this.socket = io();
         this.callbacks = {}; 
+        this.packed = typeof WireCodec !== 'undefined';
+
+        if (this.packed) {
+            // Negotiate the packed state encoding on every (re)connect
+            this.socket.on('connect', () => {
+                this.socket.emit('set_wire_format', { format: 'packed', version: WireCodec.VERSION });
+            });
+            // Decode each packed frame once and fan it out to the update_state listeners
+            this.socket.on('update_state_packed', (payload) => {
+                const state = WireCodec.decodeState(payload);
+                (this.callbacks['update_state'] || []).forEach(callback => callback(state));
+            });
+        }
     }
 
     // Rejestracja nasłuchu
     on(event, callback) {
         this.socket.on(event, callback);
+        if (event === 'update_state') {
+            (this.callbacks[event] = this.callbacks[event] || []).push(callback);
+        }
     }
 
     // Wysyłanie
     emit(event, data) {
         this.socket.emit(event, data);
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,121 @@
+/**
+ * Wire Codec
+ * Decodes the packed binary 'update_state_packed' frame back into the same
+ * object shape the JSON 'update_state' event carries, so managers don't care
+ * which encoding the server used. Layout must match encode_packed_state() in app.py.
+ */
+class WireCodec {
+    static VERSION = 1;
+    static TEAMS = ['NEUTRAL', 'RED', 'BLUE', 'SPECTATOR'];
+    static SPEEDS = [null, 'FAST', 'NORMAL', 'SLOW'];
+    static ABILITIES = ['instant_charge', 'shield_break', 'global_shield', 'boost', 'freeze'];
+    static NULL_STRING = 0xFF;
+
+    static decodeState(payload) {
+        const bytes = payload instanceof ArrayBuffer ? new Uint8Array(payload) : new Uint8Array(payload.buffer, payload.byteOffset, payload.byteLength);
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        const decoder = new TextDecoder();
+        let pos = 0;
+
+        const u8 = () => view.getUint8(pos++);
+        const u16 = () => { const v = view.getUint16(pos, true); pos += 2; return v; };
+        const u32 = () => { const v = view.getUint32(pos, true); pos += 4; return v; };
+        const f32 = () => { const v = view.getFloat32(pos, true); pos += 4; return v; };
+        const f64 = () => { const v = view.getFloat64(pos, true); pos += 8; return v; };
+        const str = () => {
+            const len = u8();
+            if (len === WireCodec.NULL_STRING) return null;
+            const s = decoder.decode(bytes.subarray(pos, pos + len));
+            pos += len;
+            return s;
+        };
+        const round = (v, digits) => { const m = Math.pow(10, digits); return Math.round(v * m) / m; };
+
+        // --- HEADER ---
+        const version = u8();
+        if (version !== WireCodec.VERSION) throw new Error(`Unsupported wire version ${version}`);
+        const flags = u8();
+        const now = f64();
+        const epoch = (offset) => offset === 0 ? 0 : now + offset;
+
+        const gameDuration = f32();
+        const difficulty = round(f32(), 2);
+        const scores = { RED: round(f32(), 1), BLUE: round(f32(), 1) };
+        const bonusScores = { RED: round(f32(), 1), BLUE: round(f32(), 1) };
+        const modifiers = {
+            RED: { score_boost_end: epoch(f32()), frozen_end: epoch(f32()) },
+            BLUE: { score_boost_end: epoch(f32()), frozen_end: epoch(f32()) }
+        };
+
+        // --- CONFIG ---
+        const config = {
+            max_score: u32(),
+            max_ap: u32(),
+            ability_cost_multiplier: round(f32(), 2),
+            shield_duration_fast: u32(),
+            shield_duration_normal: u32(),
+            hack_bonus_fast: u32(),
+            hack_bonus_normal: u32(),
+            battery_drain_enabled: (flags & 2) !== 0,
+            excluded_abilities: []
+        };
+        const excludedCount = u8();
+        for (let i = 0; i < excludedCount; i++) config.excluded_abilities.push(WireCodec.ABILITIES[u8()]);
+
+        const gameMaster = str();
+        const redTeamName = str();
+        const blueTeamName = str();
+
+        // --- NODES ---
+        const nodes = {};
+        const nodeCount = u8();
+        for (let i = 0; i < nodeCount; i++) {
+            const nodeId = str();
+            const owner = WireCodec.TEAMS[u8()];
+            const speed = WireCodec.SPEEDS[u8()];
+            const shieldOffset = f32();
+            nodes[nodeId] = {
+                owner: owner,
+                shield_end: epoch(shieldOffset),
+                shield_remaining: shieldOffset > 0 ? round(shieldOffset, 1) : 0,
+                capture_speed: speed
+            };
+        }
+
+        // --- PLAYERS ---
+        const players = {};
+        const playerCount = u16();
+        for (let i = 0; i < playerCount; i++) {
+            const code = str();
+            const name = str();
+            const team = WireCodec.TEAMS[u8()];
+            const playerFlags = u8();
+            const abilityPoints = u32();
+            players[code] = {
+                name: name,
+                team: team,
+                charged: (playerFlags & 1) !== 0,
+                ability_points: abilityPoints,
+                is_gm: (playerFlags & 2) !== 0,
+                is_team_lead: (playerFlags & 4) !== 0
+            };
+        }
+
+        return {
+            nodes: nodes,
+            scores: scores,
+            bonus_scores: bonusScores,
+            players: players,
+            game_active: (flags & 1) !== 0,
+            game_master: gameMaster,
+            red_team_name: redTeamName,
+            blue_team_name: blueTeamName,
+            max_score: config.max_score,
+            max_ap: config.max_ap,
+            game_duration: gameDuration,
+            difficulty_multiplier: difficulty,
+            modifiers: modifiers,
+            config: config
+        };
+    }
+}